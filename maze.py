@@ -1,7 +1,12 @@
 import pygame
+import heapq
+import json
 import random
+import struct
+import sys
+import threading
 import time
-from collections import deque
+from collections import deque, OrderedDict
 
 # ----- CELDAS / TIPOS -----
 CELL_WALL = 1
@@ -13,6 +18,14 @@ CELL_GLADER_GATE = 5
 CELL_GLADER_WALL = 6
 CELL_EXIT_GATE = 7
 
+# Transitabilidad por tipo de celda (tablas de 256 bytes para bytes.translate).
+# Las puertas del Glade dependen de si están abiertas y se tratan aparte.
+def _passable_table(cells):
+    return bytes(1 if i in cells else 0 for i in range(256))
+
+PLAYER_PASSABLE = _passable_table({CELL_PATH, CELL_GLADER, CELL_GRIEVER_ZONE, CELL_EXIT_GATE})
+GRIEVER_PASSABLE = _passable_table({CELL_PATH, CELL_GRIEVER_ZONE, CELL_EXIT_GATE})  # no entran al Glade
+
 # ----- CONFIGURACIÓN BASE -----
 class Config:
     MAZE_WIDTH = 25
@@ -21,6 +34,36 @@ class Config:
     GATE_CHANGE_PROBABILITY = 0.6
     GLADER_GATE_COUNT = 4
     DAY_LENGTH_MS = 20_000  # ciclo día/noche
+    # Modo infinito (chunks)
+    CHUNK_SIZE = 24            # par: los nodos de tallado quedan en coordenadas impares
+    CHUNK_ACTIVE_RADIUS = 1    # chunks alrededor del jugador que se mantienen cargados
+    CHUNK_CACHE_SIZE = 16      # LRU; debe ser >= (2*radio+1)^2
+    CHUNK_SAVE_LIMIT = 64      # chunks mutados guardados tras ser desalojados
+    ENDLESS_VIEW_PAD = 6       # celdas extra de sprites alrededor de la cámara
+    # Entrada
+    INPUT_BUFFER_DEPTH = 3     # pulsaciones pendientes como máximo; se descartan las más viejas
+    INPUT_DIRECTION_PRIORITY = ("up", "down", "left", "right")  # con varias teclas mantenidas
+    INPUT_LATENCY_SAMPLES = 1000
+    INPUT_MODE = "queue"       # "poll": sólo teclas mantenidas, como antes; mismas estadísticas
+    # Telemetría
+    TELEMETRY_PATH = None            # p.ej. "maze_events.jsonl"; None = sin fichero
+    TELEMETRY_FORMAT = "jsonl"       # "jsonl" o "binary"
+    TELEMETRY_LEVEL = "INFO"         # DEBUG / INFO / WARN
+    TELEMETRY_BUFFER_SIZE = 4096     # registros en el ring buffer (potencia de 2)
+    TELEMETRY_FLUSH_MS = 250
+    TELEMETRY_SAMPLE_EVERY = {"cell_flipped": 16}  # 1 de cada N por evento
+    TELEMETRY_ECHO = True            # el hilo escritor imprime los mensajes legibles
+    TELEMETRY_BUDGET_US = 20.0       # coste medio máximo aceptable por emit()
+    # Pathfinding jerárquico (HPA*) de los Grievers
+    HPA_CLUSTER_SIZE = 8
+    HPA_MIN_CELLS = 2500             # por debajo de este área basta el BFS directo
+    HPA_FULL_REBUILD_RATIO = 0.5     # con más clusters sucios que esto, se reconstruye todo
+    # Planificador incremental (pista / piloto automático)
+    PLANNER_COMPARE_BFS = False      # True: mide también un BFS completo por replanificación
+    # Rebobinado
+    REWIND_SECONDS = 5               # cuánto retrocede la tecla B
+    REWIND_MAX_SNAPSHOTS = 60 * 30   # tamaño del anillo (un snapshot por frame)
+    REWIND_MEMORY_BUDGET_BYTES = 2_000_000
 
 # ----- DIFICULTADES -----
 class Difficulty:
@@ -52,6 +95,307 @@ class Difficulty:
         "griever_step_ms": 200,
     }
 
+# ----- ENTRADA -----
+DIRECTION_DELTAS = {"up": (0, -1), "down": (0, 1), "left": (-1, 0), "right": (1, 0)}
+DIRECTION_KEYS = {
+    pygame.K_UP: "up", pygame.K_w: "up",
+    pygame.K_DOWN: "down", pygame.K_s: "down",
+    pygame.K_LEFT: "left", pygame.K_a: "left",
+    pygame.K_RIGHT: "right", pygame.K_d: "right",
+}
+
+class InputQueue:
+    # Modo "queue": guarda las pulsaciones (KEYDOWN) para que un toque durante el
+    # cooldown no se pierda. Modo "poll": sólo cuentan las teclas mantenidas y la
+    # pulsación se recuerda para medir la latencia del primer movimiento que provoque.
+    def __init__(self, depth=None, priority=None, mode=None):
+        self.depth = depth or Config.INPUT_BUFFER_DEPTH
+        self.priority = priority or Config.INPUT_DIRECTION_PRIORITY
+        self.mode = mode or Config.INPUT_MODE
+        self.pending = deque()
+        self.unclaimed = {}  # modo poll: dirección -> última pulsación sin movimiento
+        self.dropped = 0
+
+    def push(self, direction, pressed_at):
+        if self.mode == "poll":
+            self.unclaimed[direction] = pressed_at
+            return
+        if len(self.pending) >= self.depth:
+            self.pending.popleft()
+            self.dropped += 1
+        self.pending.append((direction, pressed_at))
+
+    def pop(self):
+        return self.pending.popleft() if self.pending else None
+
+    def claim(self, direction):
+        return self.unclaimed.pop(direction, None)
+
+    def clear(self):
+        self.pending.clear()
+        self.unclaimed.clear()
+
+    def held_direction(self, keys):
+        for direction in self.priority:
+            for key, key_direction in DIRECTION_KEYS.items():
+                if key_direction == direction and keys[key]:
+                    return direction
+        return None
+
+class InputLatencyStats:
+    # Latencias en ms por preset de move_delay_ms: pulsación -> movimiento y -> primer frame.
+    # `mode` es el de la InputQueue que genera las muestras (sale en el informe).
+    # La pulsación se sella al leerla con event.get(): pygame 2.6 no expone la hora
+    # de SDL, así que la espera en la cola de eventos no entra en la medida.
+    def __init__(self, max_samples=None, mode=None):
+        self.max_samples = max_samples or Config.INPUT_LATENCY_SAMPLES
+        self.mode = mode or Config.INPUT_MODE
+        self.presets = {}
+        self.awaiting_frame = []
+
+    def _preset(self, move_delay_ms):
+        if move_delay_ms not in self.presets:
+            self.presets[move_delay_ms] = {
+                "move": deque(maxlen=self.max_samples),
+                "frame": deque(maxlen=self.max_samples),
+                "buffered": 0,  # pulsaciones llegadas durante el cooldown
+            }
+        return self.presets[move_delay_ms]
+
+    def record_buffered(self, move_delay_ms):
+        self._preset(move_delay_ms)["buffered"] += 1
+
+    def record_move(self, move_delay_ms, pressed_at, moved_at):
+        self._preset(move_delay_ms)["move"].append((moved_at - pressed_at) * 1000)
+        self.awaiting_frame.append((move_delay_ms, pressed_at))
+
+    def record_frame(self, shown_at):
+        for move_delay_ms, pressed_at in self.awaiting_frame:
+            self._preset(move_delay_ms)["frame"].append((shown_at - pressed_at) * 1000)
+        self.awaiting_frame.clear()
+
+    @staticmethod
+    def _describe(samples):
+        if not samples:
+            return "n=0"
+        ordered = sorted(samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return f"n={len(ordered)} mean={sum(ordered) / len(ordered):.1f} p95={p95:.1f} max={ordered[-1]:.1f}"
+
+    def report(self):
+        lines = []
+        for move_delay_ms in sorted(self.presets):
+            p = self.presets[move_delay_ms]
+            lines.append(f"[Input] mode={self.mode} move_delay={move_delay_ms}ms buffered={p['buffered']} | "
+                         f"key->move {self._describe(p['move'])} | key->frame {self._describe(p['frame'])}")
+        return "\n".join(lines)
+
+# ----- TELEMETRÍA -----
+TELEMETRY_LEVELS = {"DEBUG": 10, "INFO": 20, "WARN": 30}
+TELEMETRY_DEBUG = TELEMETRY_LEVELS["DEBUG"]
+TELEMETRY_INFO = TELEMETRY_LEVELS["INFO"]
+TELEMETRY_WARN = TELEMETRY_LEVELS["WARN"]
+TELEMETRY_LEVEL_NAMES = {v: k for k, v in TELEMETRY_LEVELS.items()}
+
+class NullTelemetry:
+    def emit(self, event, level=TELEMETRY_INFO, message=None, **fields):
+        pass
+
+    def enabled_for(self, level):
+        return False
+
+    def close(self):
+        pass
+
+class Telemetry:
+    # Ring buffer de un productor (hilo del juego) y un consumidor (hilo escritor).
+    # El juego sólo escribe slots[head] y avanza head; el escritor sólo avanza tail,
+    # así que no hace falta lock. Si el buffer está lleno el evento se descarta:
+    # emit() nunca bloquea un frame. Cada BUDGET_WINDOW eventos se compara su coste
+    # medio con TELEMETRY_BUDGET_US; si se pasa, primero se dejan de registrar los
+    # DEBUG y después se muestrea el doble, avisando con un evento WARN.
+    BUDGET_WINDOW = 256
+
+    def __init__(self, path=None, fmt=None, level=None, capacity=None,
+                 sample_every=None, echo=None, flush_ms=None):
+        self.path = path if path is not None else Config.TELEMETRY_PATH
+        self.format = fmt or Config.TELEMETRY_FORMAT
+        self.level = TELEMETRY_LEVELS[level or Config.TELEMETRY_LEVEL]
+        self.sample_every = dict(Config.TELEMETRY_SAMPLE_EVERY if sample_every is None else sample_every)
+        self.echo = Config.TELEMETRY_ECHO if echo is None else echo
+        self.flush_ms = flush_ms or Config.TELEMETRY_FLUSH_MS
+
+        size = 1
+        while size < (capacity or Config.TELEMETRY_BUFFER_SIZE):
+            size <<= 1
+        self.slots = [None] * size
+        self.mask = size - 1
+        self.head = 0  # sólo lo escribe el productor
+        self.tail = 0  # sólo lo escribe el consumidor
+
+        self.sample_counters = {}
+        self.stats = {"emitted": 0, "dropped": 0, "sampled_out": 0, "written": 0, "emit_ns": 0,
+                      "budget_actions": 0}
+        self._window_ns = 0
+        self.started_ns = time.perf_counter_ns()
+        self._event_ids = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="maze-telemetry", daemon=True)
+        self._thread.start()
+
+    def enabled_for(self, level):
+        return level >= self.level
+
+    def emit(self, event, level=TELEMETRY_INFO, message=None, **fields):
+        if level < self.level:
+            return
+        start = time.perf_counter_ns()
+        every = self.sample_every.get(event, 1)
+        if every > 1:
+            seen = self.sample_counters.get(event, 0)
+            self.sample_counters[event] = seen + 1
+            if seen % every:
+                self.stats["sampled_out"] += 1
+                return
+        if self.head - self.tail > self.mask:
+            self.stats["dropped"] += 1
+            return
+        self.slots[self.head & self.mask] = (start, level, event, message, fields)
+        self.head += 1
+        self.stats["emitted"] += 1
+        self.stats["emit_ns"] += time.perf_counter_ns() - start
+        if not self.stats["emitted"] % self.BUDGET_WINDOW:
+            self._check_budget()
+
+    def mean_emit_us(self):
+        if not self.stats["emitted"]:
+            return 0.0
+        return self.stats["emit_ns"] / self.stats["emitted"] / 1000
+
+    def _check_budget(self):
+        window_us = (self.stats["emit_ns"] - self._window_ns) / self.BUDGET_WINDOW / 1000
+        self._window_ns = self.stats["emit_ns"]
+        if window_us <= Config.TELEMETRY_BUDGET_US:
+            return
+        if self.level <= TELEMETRY_DEBUG:
+            self.level = TELEMETRY_INFO
+            action = "debug_off"
+        elif self.sample_every:
+            for event in self.sample_every:
+                self.sample_every[event] *= 2
+            action = "sampling_halved"
+        else:
+            action = "none"
+        self.stats["budget_actions"] += 1
+        self.emit("telemetry_over_budget", TELEMETRY_WARN,
+                  message=f"[Telemetry] emit cost {window_us:.1f}us over budget: {action}",
+                  mean_emit_us=round(window_us, 2), action=action)
+
+    def summary(self):
+        return (f"[Telemetry] emitted={self.stats['emitted']} written={self.stats['written']} "
+                f"dropped={self.stats['dropped']} sampled_out={self.stats['sampled_out']} "
+                f"mean_emit={self.mean_emit_us():.2f}us (budget {Config.TELEMETRY_BUDGET_US}us, "
+                f"actions={self.stats['budget_actions']})")
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+
+    # --- hilo escritor ---
+    def _run(self):
+        out = None
+        if self.path:
+            out = open(self.path, "ab" if self.format == "binary" else "a", encoding=None if self.format == "binary" else "utf-8")
+        try:
+            while not self._stop.wait(self.flush_ms / 1000):
+                self._drain(out)
+            self._drain(out)
+        finally:
+            if out is not None:
+                out.close()
+
+    def _drain(self, out):
+        written = 0
+        while self.tail < self.head:
+            i = self.tail & self.mask
+            record = self.slots[i]
+            self.slots[i] = None
+            self.tail += 1
+            if self.echo and record[3]:
+                print(record[3])
+            if out is None:
+                continue
+            if self.format == "binary":
+                self._write_binary(out, record)
+            else:
+                self._write_jsonl(out, record)
+            written += 1
+        if written:
+            out.flush()
+            self.stats["written"] += written
+
+    def _write_jsonl(self, out, record):
+        t_ns, level, event, _, fields = record
+        entry = {"t_ms": round((t_ns - self.started_ns) / 1e6, 3),
+                 "level": TELEMETRY_LEVEL_NAMES[level], "event": event}
+        entry.update(fields)
+        out.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def _write_binary(self, out, record):
+        # 0: definición de evento (id, nombre); 1: evento (t_ms, nivel, id, payload JSON)
+        t_ns, level, event, _, fields = record
+        event_id = self._event_ids.get(event)
+        if event_id is None:
+            event_id = self._event_ids[event] = len(self._event_ids)
+            name = event.encode("utf-8")
+            out.write(struct.pack("<BHB", 0, event_id, len(name)) + name)
+        payload = json.dumps(fields, separators=(",", ":")).encode("utf-8") if fields else b""
+        t_ms = (t_ns - self.started_ns) // 1_000_000
+        out.write(struct.pack("<BIBHH", 1, t_ms, level, event_id, len(payload)) + payload)
+
+def read_telemetry_log(path):
+    names = {}
+    with open(path, "rb") as f:
+        while True:
+            kind = f.read(1)
+            if not kind:
+                return
+            if kind[0] == 0:
+                event_id, size = struct.unpack("<HB", f.read(3))
+                names[event_id] = f.read(size).decode("utf-8")
+                continue
+            t_ms, level, event_id, size = struct.unpack("<IBHH", f.read(9))
+            entry = {"t_ms": t_ms, "level": TELEMETRY_LEVEL_NAMES[level], "event": names[event_id]}
+            if size:
+                entry.update(json.loads(f.read(size)))
+            yield entry
+
+# ----- TALLADO -----
+# DFS con saltos de 2 celdas sobre `grid` (lista de filas), in-place.
+def carve_depth_first(grid, starts, can_carve, rng=random):
+    height, width = len(grid), len(grid[0])
+    stack = []
+    for sx, sy in starts:
+        if 0 <= sx < width and 0 <= sy < height and grid[sy][sx] == CELL_WALL:
+            grid[sy][sx] = CELL_PATH
+            stack.append((sx, sy))
+    while stack:
+        x, y = stack[-1]
+        neighbors = []
+        for dx, dy in [(0, 2), (2, 0), (0, -2), (-2, 0)]:
+            nx, ny = x + dx, y + dy
+            if (0 <= nx < width and 0 <= ny < height and
+                grid[ny][nx] == CELL_WALL and
+                can_carve(nx, ny)):
+                neighbors.append((dx, dy))
+        if neighbors:
+            dx, dy = rng.choice(neighbors)
+            grid[y + dy//2][x + dx//2] = CELL_PATH
+            grid[y + dy][x + dx] = CELL_PATH
+            stack.append((x + dx, y + dy))
+        else:
+            stack.pop()
+
 # ----- SPRITES -----
 class WallSprite(pygame.sprite.Sprite):
     def __init__(self, x, y, cell_size, color):
@@ -167,7 +511,10 @@ class GrieverSprite(pygame.sprite.Sprite):
 
 # ----- LABERINTO -----
 class MazeRunnerMaze:
-    def __init__(self, difficulty="MEDIUM"):
+    supports_rewind = True
+
+    def __init__(self, difficulty="MEDIUM", telemetry=None):
+        self.telemetry = telemetry or NullTelemetry()
         self.width = Config.MAZE_WIDTH
         self.height = Config.MAZE_HEIGHT
         self.cell_size = Config.CELL_SIZE
@@ -178,6 +525,7 @@ class MazeRunnerMaze:
         self.exit_found = False
         self.possible_gate_positions = []
         self.player_in_glade = True
+        self.change_listeners = []  # listener(cells): celdas cambiadas, o None si cambió todo
 
         self.colors = {
             'wall': (40, 40, 60),
@@ -198,7 +546,9 @@ class MazeRunnerMaze:
         self.path_sprites = pygame.sprite.Group()
         self.all_sprites = pygame.sprite.Group()
 
+        self._build_region_masks()
         self.generate_full_maze()
+        self._rebuild_passability()
         self._create_sprite_groups()
 
     # --- Generación inicial ---
@@ -220,28 +570,33 @@ class MazeRunnerMaze:
         self.path_sprites.empty()
         self.all_sprites.empty()
 
-        for y in range(self.height):
-            for x in range(self.width):
-                cell = self.maze[y][x]
-                if cell in [CELL_WALL, CELL_OUTER_WALL, CELL_GLADER_WALL]:
-                    sprite = WallSprite(x, y, self.cell_size, self.colors['wall'])
-                    self.wall_sprites.add(sprite); self.all_sprites.add(sprite)
-                elif cell == CELL_GLADER_GATE:
-                    is_open = self.glader_gates.get((x, y), False)
-                    sprite = GateSprite(x, y, self.cell_size,
-                                        self.colors['glader_gate_open'],
-                                        self.colors['glader_gate_closed'],
-                                        is_open)
-                    self.gate_sprites.add(sprite); self.all_sprites.add(sprite)
-                elif cell == CELL_EXIT_GATE:
-                    sprite = ExitGateSprite(x, y, self.cell_size, self.colors['exit_gate'])
-                    self.exit_sprites.add(sprite); self.all_sprites.add(sprite)
-                elif cell == CELL_GLADER:
-                    sprite = WallSprite(x, y, self.cell_size, self.colors['glader'])
-                    self.all_sprites.add(sprite)
-                elif cell == CELL_PATH:
-                    sprite = PathSprite(x, y, self.cell_size, self.colors['path'])
-                    self.path_sprites.add(sprite); self.all_sprites.add(sprite)
+        for x, y in self._cells_in_view():
+            self._make_cell_sprite(x, y)
+
+    def _make_cell_sprite(self, x, y):
+        cell = self.maze[y][x]
+        if cell in [CELL_WALL, CELL_OUTER_WALL, CELL_GLADER_WALL]:
+            sprite = WallSprite(x, y, self.cell_size, self.colors['wall'])
+            self.wall_sprites.add(sprite); self.all_sprites.add(sprite)
+        elif cell == CELL_GLADER_GATE:
+            is_open = self.glader_gates.get((x, y), False)
+            sprite = GateSprite(x, y, self.cell_size,
+                                self.colors['glader_gate_open'],
+                                self.colors['glader_gate_closed'],
+                                is_open)
+            self.gate_sprites.add(sprite); self.all_sprites.add(sprite)
+        elif cell == CELL_EXIT_GATE:
+            sprite = ExitGateSprite(x, y, self.cell_size, self.colors['exit_gate'])
+            self.exit_sprites.add(sprite); self.all_sprites.add(sprite)
+        elif cell == CELL_GLADER:
+            sprite = WallSprite(x, y, self.cell_size, self.colors['glader'])
+            self.all_sprites.add(sprite)
+        elif cell == CELL_PATH:
+            sprite = PathSprite(x, y, self.cell_size, self.colors['path'])
+            self.path_sprites.add(sprite); self.all_sprites.add(sprite)
+        else:
+            return None
+        return sprite
 
     def _create_outer_walls(self):
         for i in range(self.width):
@@ -293,23 +648,12 @@ class MazeRunnerMaze:
         self._connect_glader_gates()
 
     def _generate_with_depth_first(self):
-        stack = []
+        starts = []
         for (px, py) in self.glader_gates.keys():
             sx, sy = self._get_gate_outer_position(px, py)
-            if sx is not None and self._is_valid_coord(sx, sy):
-                if self.maze[sy][sx] == CELL_WALL:
-                    self.maze[sy][sx] = CELL_PATH
-                    stack.append((sx, sy))
-        while stack:
-            x, y = stack[-1]
-            neighbors = self._get_unvisited_neighbors(x, y)
-            if neighbors:
-                dx, dy = random.choice(neighbors)
-                self.maze[y + dy//2][x + dx//2] = CELL_PATH
-                self.maze[y + dy][x + dx] = CELL_PATH
-                stack.append((x + dx, y + dy))
-            else:
-                stack.pop()
+            if sx is not None:
+                starts.append((sx, sy))
+        carve_depth_first(self.maze, starts, self._is_outer_area)
 
     def _get_gate_outer_position(self, px, py):
         cx, cy = self.width // 2, self.height // 2
@@ -319,16 +663,6 @@ class MazeRunnerMaze:
         if py > cy: return px, py+1
         return None, None
 
-    def _get_unvisited_neighbors(self, x, y):
-        neighbors = []
-        for dx, dy in [(0, 2), (2, 0), (0, -2), (-2, 0)]:
-            nx, ny = x + dx, y + dy
-            if (self._is_valid_coord(nx, ny) and
-                self.maze[ny][nx] == CELL_WALL and
-                self._is_outer_area(nx, ny)):
-                neighbors.append((dx, dy))
-        return neighbors
-
     def _connect_glader_gates(self):
         for (px, py) in self.glader_gates.keys():
             cx, cy = self._get_gate_outer_position(px, py)
@@ -378,25 +712,121 @@ class MazeRunnerMaze:
             self._place_random_exit_gates()
 
     # --- Utilidades de estado ---
+    def _cells_in_view(self):
+        for y in range(self.height):
+            for x in range(self.width):
+                yield x, y
+
+    def camera_origin(self):
+        return 0, 0
+
+    def bounds(self):
+        return 0, 0, self.width, self.height
+
+    def add_change_listener(self, listener):
+        self.change_listeners.append(listener)
+
+    def _cells_changed(self, cells=None):
+        if cells is None:
+            if self.bounds() != self.pass_bounds:  # las máscaras sólo dependen del área
+                self._build_region_masks()
+            self._rebuild_passability()
+        else:
+            self._update_passability(cells)
+        for listener in self.change_listeners:
+            listener(cells)
+
+    def _bounds_changed(self):
+        # Las celdas no cambian, sólo el área: los listeners comparan bounds() por
+        # su cuenta y reaprovechan lo que siga dentro.
+        self._build_region_masks()
+        self._rebuild_passability()
+
+    def _row_cells(self, y, x0, x1):
+        return self.maze[y][x0:x1]
+
+    # --- Tablas de paso precalculadas ---
+    # Un byte por celda de bounds() con un borde de 1 celda a 0. Contrato de las
+    # consultas (_is_valid_move, _tile_is_passable_for_griever, _is_outer_area,
+    # _is_in_glade): la celda está en bounds() o en ese borde, es decir, es una
+    # celda del tablero o vecina de una. Así la lectura es un único índice sin
+    # comprobar rangos; más lejos caería en otra fila sin dar error.
+    def _glade_center(self):
+        return self.width // 2, self.height // 2
+
+    def _table_index(self, x, y):
+        # Sólo para construir y parchear las tablas; las consultas indexan directamente
+        i = (y - self.pass_y0) * self.pass_stride + x - self.pass_x0
+        assert 0 <= x - self.pass_x0 < self.pass_stride and 0 <= i < len(self.outer_mask), (x, y)
+        return i
+
+    def _build_region_masks(self):
+        x0, y0, x1, y1 = self.pass_bounds = self.bounds()
+        self.pass_x0, self.pass_y0 = x0 - 1, y0 - 1
+        self.pass_stride = (x1 - x0) + 2
+        size = self.pass_stride * ((y1 - y0) + 2)
+        self.glade_mask = bytearray(size)
+        self.outer_mask = bytearray(size)
+        width = x1 - x0
+        for y in range(y0, y1):
+            i = self._table_index(x0, y)
+            self.outer_mask[i:i + width] = b"\x01" * width
+        # fuera sólo queda la caja de 5x5 del Glade; dentro, sus 3x3 centrales
+        cx, cy = self._glade_center()
+        for y in range(max(cy-2, y0), min(cy+3, y1)):
+            for x in range(max(cx-2, x0), min(cx+3, x1)):
+                i = self._table_index(x, y)
+                self.outer_mask[i] = 0
+                self.glade_mask[i] = abs(x - cx) <= 1 and abs(y - cy) <= 1
+        self.player_passable = bytearray(size)
+        self.griever_passable = bytearray(size)
+
+    def _rebuild_passability(self):
+        # Fila a fila con bytes.translate; las puertas dependen de su estado
+        x0, y0, x1, y1 = self.bounds()
+        width = x1 - x0
+        for y in range(y0, y1):
+            row = bytes(self._row_cells(y, x0, x1))
+            i = self._table_index(x0, y)
+            self.player_passable[i:i + width] = row.translate(PLAYER_PASSABLE)
+            self.griever_passable[i:i + width] = row.translate(GRIEVER_PASSABLE)
+        self._update_passability(self.glader_gates)
+
+    def _update_passability(self, cells):
+        for x, y in cells:
+            if not self._is_valid_coord(x, y):
+                continue
+            cell = self.maze[y][x]
+            i = self._table_index(x, y)
+            if cell == CELL_GLADER_GATE:
+                self.player_passable[i] = self.griever_passable[i] = \
+                    1 if self.glader_gates.get((x, y), False) else 0
+            else:
+                self.player_passable[i] = PLAYER_PASSABLE[cell]
+                self.griever_passable[i] = GRIEVER_PASSABLE[cell]
+
+    def set_focus(self, x, y):
+        return False  # tablero fijo: nunca hay que recentrar
+
     def _is_outer_area(self, x, y):
-        cx, cy = self.width // 2, self.height // 2
-        return (abs(x - cx) >= 3 or abs(y - cy) >= 3)
+        return self.outer_mask[(y - self.pass_y0) * self.pass_stride + x - self.pass_x0]
 
     def _is_valid_coord(self, x, y):
         return 0 <= x < self.width and 0 <= y < self.height
 
     def _is_in_glade(self, x, y):
-        cx, cy = self.width // 2, self.height // 2
-        return (cx-1 <= x <= cx+1 and cy-1 <= y <= cy+1)
+        return self.glade_mask[(y - self.pass_y0) * self.pass_stride + x - self.pass_x0]
 
     def update_player_state(self, x, y):
-        new_state = self._is_in_glade(x, y)
+        new_state = bool(self._is_in_glade(x, y))
         old_state = self.player_in_glade
         self.player_in_glade = new_state
         if old_state and not new_state:
-            print("Player left the Glade! Maze will start changing.")
+            self.telemetry.emit("glade_exit", x=x, y=y,
+                                message="Player left the Glade! Maze will start changing.")
         elif not old_state and new_state:
-            print("Player entered the Glade! Maze stabilizes.")
+            self.telemetry.emit("glade_enter", x=x, y=y,
+                                message="Player entered the Glade! Maze stabilizes.")
         return new_state
 
     # --- Cambios dinámicos ---
@@ -405,22 +835,31 @@ class MazeRunnerMaze:
             return
         if prob is None:
             prob = self.difficulty.get("gate_change_probability", Config.GATE_CHANGE_PROBABILITY)
+        toggled = []
         for sprite in self.gate_sprites:
             if random.random() < prob:
                 sprite.toggle()
                 x = sprite.rect.x // self.cell_size
                 y = sprite.rect.y // self.cell_size
                 self.glader_gates[(x, y)] = sprite.is_open
+                toggled.append((x, y))
+        if toggled:
+            self._cells_changed(toggled)
+            self.telemetry.emit("gates_toggled", toggled=len(toggled),
+                                open=sum(1 for is_open in self.glader_gates.values() if is_open))
 
     def change_exit_gates(self):
         if not self.player_in_glade:
             return
-        for (x, y) in self.exit_gates.keys():
+        old_exits = list(self.exit_gates.keys())
+        for (x, y) in old_exits:
             if self._is_valid_coord(x, y):
                 self.maze[y][x] = CELL_OUTER_WALL
         self.exit_gates.clear()
         self._place_random_exit_gates()
         self._create_sprite_groups()
+        self._cells_changed(old_exits + list(self.exit_gates.keys()))
+        self.telemetry.emit("exits_relocated", exits=[list(pos) for pos in self.exit_gates])
 
     def change_maze_layout(self):
         if self.player_in_glade:
@@ -428,20 +867,24 @@ class MazeRunnerMaze:
         changes = 0
         prob = self.difficulty["maze_change_probability"]
         change_positions = []
-        for y in range(self.height):
-            for x in range(self.width):
-                if (self._is_outer_area(x, y) and
-                    self.maze[y][x] in [CELL_WALL, CELL_PATH] and
-                    (x, y) not in self.exit_gates and
-                    (x, y) not in self.glader_gates and
-                    random.random() < prob):
-                    change_positions.append((x, y))
+        for x, y in self._cells_in_view():
+            if (self._is_valid_coord(x, y) and self._is_outer_area(x, y) and
+                self.maze[y][x] in [CELL_WALL, CELL_PATH] and
+                (x, y) not in self.exit_gates and
+                (x, y) not in self.glader_gates and
+                random.random() < prob):
+                change_positions.append((x, y))
+        trace_cells = self.telemetry.enabled_for(TELEMETRY_DEBUG)
         for x, y in change_positions:
             self.maze[y][x] = CELL_PATH if self.maze[y][x] == CELL_WALL else CELL_WALL
             changes += 1
+            if trace_cells:
+                self.telemetry.emit("cell_flipped", TELEMETRY_DEBUG, x=x, y=y, cell=self.maze[y][x])
         if changes > 0:
             self._create_sprite_groups()
-            print(f"Maze changed! {changes} cells modified")
+            self._cells_changed(change_positions)
+            self.telemetry.emit("maze_morph", changes=changes,
+                                message=f"Maze changed! {changes} cells modified")
             return True
         return False
 
@@ -457,27 +900,898 @@ class MazeRunnerMaze:
         if y == self.height-2 and (x, self.height-1) in self.exit_gates: return True
         return False
 
+# ----- MUNDO INFINITO (CHUNKS) -----
+class MazeChunk:
+    def __init__(self, cx, cy, cells):
+        self.cx = cx
+        self.cy = cy
+        self.cells = cells  # filas locales CHUNK_SIZE x CHUNK_SIZE
+        self.dirty = False  # True si un morph lo modificó respecto a su semilla
+
+class ChunkedMazeWorld:
+    # Cada chunk se genera a partir de (seed, cx, cy), así que puede descartarse
+    # y regenerarse idéntico. Sólo los chunks mutados se guardan al desalojarlos.
+    # La columna 0 y la fila 0 de cada chunk son muro; el chunk abre sus propias
+    # puertas oeste/norte y las del este/sur las abre el vecino.
+    def __init__(self, seed, chunk_size=None, cache_size=None, save_limit=None):
+        self.seed = seed
+        self.chunk_size = chunk_size or Config.CHUNK_SIZE
+        self.cache_size = cache_size or Config.CHUNK_CACHE_SIZE
+        self.save_limit = save_limit if save_limit is not None else Config.CHUNK_SAVE_LIMIT
+        self.chunks = OrderedDict()  # (cx, cy) -> MazeChunk, del menos al más reciente
+        self.saved = OrderedDict()   # (cx, cy) -> bytes de chunks mutados ya desalojados
+        self.glade_center = (self.chunk_size // 2, self.chunk_size // 2)
+        self.glader_gates = {}
+        self.possible_gate_positions = []
+        self.stats = {"hits": 0, "misses": 0, "generated": 0, "restored": 0,
+                      "evicted": 0, "saved": 0, "dropped": 0}
+        self.get_chunk(0, 0)
+
+    def chunk_coords(self, x, y):
+        return x // self.chunk_size, y // self.chunk_size
+
+    def get_chunk(self, cx, cy):
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            self.stats["hits"] += 1
+            return chunk
+        self.stats["misses"] += 1
+        data = self.saved.pop(key, None)
+        if data is not None:
+            size = self.chunk_size
+            cells = [list(data[i*size:(i+1)*size]) for i in range(size)]
+            chunk = MazeChunk(cx, cy, cells)
+            chunk.dirty = True
+            self.stats["restored"] += 1
+        else:
+            chunk = MazeChunk(cx, cy, self._generate_chunk(cx, cy))
+            self.stats["generated"] += 1
+        self.chunks[key] = chunk
+        while len(self.chunks) > self.cache_size:
+            self._evict()
+        return chunk
+
+    def row_cells(self, y, x0, x1):
+        size = self.chunk_size
+        cy, ly = divmod(y, size)
+        cells = []
+        for cx in range(x0 // size, (x1 - 1) // size + 1):
+            left = cx * size
+            cells += self.get_chunk(cx, cy).cells[ly][max(x0 - left, 0):min(x1 - left, size)]
+        return cells
+
+    def get_cell(self, x, y):
+        size = self.chunk_size
+        return self.get_chunk(x // size, y // size).cells[y % size][x % size]
+
+    def set_cell(self, x, y, value):
+        size = self.chunk_size
+        chunk = self.get_chunk(x // size, y // size)
+        chunk.cells[y % size][x % size] = value
+        chunk.dirty = True
+
+    def _evict(self):
+        key, chunk = self.chunks.popitem(last=False)
+        self.stats["evicted"] += 1
+        if not chunk.dirty:
+            return  # se regenera igual desde la semilla
+        self.saved[key] = bytes(cell for row in chunk.cells for cell in row)
+        self.stats["saved"] += 1
+        # Memoria acotada: los guardados más antiguos vuelven a su estado sembrado
+        while len(self.saved) > self.save_limit:
+            self.saved.popitem(last=False)
+            self.stats["dropped"] += 1
+
+    def _generate_chunk(self, cx, cy):
+        size = self.chunk_size
+        rng = random.Random(f"{self.seed}:{cx}:{cy}")
+        grid = [[CELL_WALL for _ in range(size)] for _ in range(size)]
+        is_origin = (cx, cy) == (0, 0)
+        gx, gy = self.glade_center
+        if is_origin:
+            gates = self._lay_out_glade(grid, rng)
+            can_carve = lambda x, y: abs(x - gx) >= 3 or abs(y - gy) >= 3
+        else:
+            can_carve = lambda x, y: True
+        carve_depth_first(grid, [(1, 1)], can_carve, rng)
+        if is_origin:
+            # conectar cada puerta del Glade con el pasillo exterior contiguo
+            for px, py in gates:
+                if abs(py - gy) == 2:
+                    grid[py + (py - gy) // 2][px] = CELL_PATH
+                else:
+                    grid[py][px + (px - gx) // 2] = CELL_PATH
+        odd = list(range(1, size, 2))
+        for y in rng.sample(odd, 2):
+            grid[y][0] = CELL_PATH
+        for x in rng.sample(odd, 2):
+            grid[0][x] = CELL_PATH
+        return grid
+
+    def _lay_out_glade(self, grid, rng):
+        cx, cy = self.glade_center
+        for y in range(cy-2, cy+3):
+            for x in range(cx-2, cx+3):
+                if abs(x - cx) == 2 or abs(y - cy) == 2:
+                    grid[y][x] = CELL_GLADER_WALL
+                else:
+                    grid[y][x] = CELL_GLADER
+        positions = []
+        for x in range(cx-1, cx+2):
+            positions.append((x, cy-2))
+            positions.append((x, cy+2))
+        for y in range(cy-1, cy+2):
+            positions.append((cx-2, y))
+            positions.append((cx+2, y))
+        self.possible_gate_positions = positions
+        chosen = rng.sample(positions, min(Config.GLADER_GATE_COUNT, len(positions)))
+        states = {pos: rng.choice([True, False]) for pos in chosen}
+        for x, y in chosen:
+            grid[y][x] = CELL_GLADER_GATE
+        if not self.glader_gates:  # al regenerar el origen se conserva el estado actual
+            self.glader_gates.update(states)
+        return chosen
+
+class WorldRowView:
+    __slots__ = ("world", "y")
+
+    def __init__(self, world, y):
+        self.world = world
+        self.y = y
+
+    def __getitem__(self, x):
+        return self.world.get_cell(x, self.y)
+
+    def __setitem__(self, x, value):
+        self.world.set_cell(x, self.y, value)
+
+class WorldGridView:
+    # Permite seguir usando maze[y][x] con coordenadas de mundo
+    def __init__(self, world):
+        self.world = world
+
+    def __getitem__(self, y):
+        return WorldRowView(self.world, y)
+
+class EndlessMazeRunnerMaze(MazeRunnerMaze):
+    supports_rewind = False  # el estado vive en la caché de chunks
+    # width/height son el tamaño de la vista; el tablero real es el mundo por chunks
+    def __init__(self, difficulty="MEDIUM", seed=None, telemetry=None):
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.world = ChunkedMazeWorld(seed)
+        self.focus = self.world.glade_center
+        self.view_center = self.focus
+        self.active_bounds = (0, 0, 0, 0)
+        self._update_active_chunks()
+        super().__init__(difficulty, telemetry)
+
+    def generate_full_maze(self):
+        self.maze = WorldGridView(self.world)
+        self.glader_gates = self.world.glader_gates
+        self.possible_gate_positions = self.world.possible_gate_positions
+        self.exit_gates = {}  # sin salidas: se corre para siempre
+
+    def _update_active_chunks(self):
+        old_bounds = self.active_bounds
+        size = self.world.chunk_size
+        radius = Config.CHUNK_ACTIVE_RADIUS
+        fcx, fcy = self.world.chunk_coords(*self.focus)
+        for cy in range(fcy - radius, fcy + radius + 1):
+            for cx in range(fcx - radius, fcx + radius + 1):
+                self.world.get_chunk(cx, cy)
+        self.active_bounds = ((fcx - radius) * size, (fcy - radius) * size,
+                              (fcx + radius + 1) * size, (fcy + radius + 1) * size)
+        return self.active_bounds != old_bounds
+
+    def _view_rect(self, center):
+        pad = Config.ENDLESS_VIEW_PAD
+        x0 = center[0] - self.width // 2 - pad
+        y0 = center[1] - self.height // 2 - pad
+        return x0, y0, x0 + self.width + 2 * pad, y0 + self.height + 2 * pad
+
+    def _cells_in_view(self):
+        x0, y0, x1, y1 = self._view_rect(self.view_center)
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                yield x, y
+
+    def _create_sprite_groups(self):
+        self.view_sprites = {}  # (x, y) -> sprite de la celda en la ventana
+        super()._create_sprite_groups()
+
+    def _make_cell_sprite(self, x, y):
+        sprite = super()._make_cell_sprite(x, y)
+        if sprite is not None:
+            self.view_sprites[(x, y)] = sprite
+        return sprite
+
+    def _scroll_view(self, center):
+        # Sólo se crean las franjas que entran en la ventana y se matan las que salen
+        ox0, oy0, ox1, oy1 = self._view_rect(self.view_center)
+        x0, y0, x1, y1 = self._view_rect(center)
+        self.view_center = center
+        for (x, y) in list(self.view_sprites):
+            if not (x0 <= x < x1 and y0 <= y < y1):
+                self.view_sprites.pop((x, y)).kill()  # kill() también lo saca del juego
+        self.view_added = []
+        for y in range(y0, y1):
+            if oy0 <= y < oy1:
+                xs = list(range(x0, min(ox0, x1))) + list(range(max(ox1, x0), x1))
+            else:
+                xs = range(x0, x1)
+            for x in xs:
+                sprite = self._make_cell_sprite(x, y)
+                if sprite is not None:
+                    self.view_added.append(sprite)
+
+    def _row_cells(self, y, x0, x1):
+        return self.world.row_cells(y, x0, x1)
+
+    def camera_origin(self):
+        return self.focus[0] - self.width // 2, self.focus[1] - self.height // 2
+
+    def set_focus(self, x, y):
+        self.focus = (x, y)
+        if self._update_active_chunks():
+            self._bounds_changed()
+        pad = Config.ENDLESS_VIEW_PAD
+        vx, vy = self.view_center
+        if abs(x - vx) <= pad and abs(y - vy) <= pad:
+            return False
+        self._scroll_view((x, y))
+        return True
+
+    def bounds(self):
+        return self.active_bounds
+
+    def _is_valid_coord(self, x, y):
+        x0, y0, x1, y1 = self.active_bounds
+        return x0 <= x < x1 and y0 <= y < y1
+
+    def _glade_center(self):
+        return self.world.glade_center
+
+    def change_exit_gates(self):
+        return
+
+# ----- PATHFINDING JERÁRQUICO (HPA*) -----
+class HierarchicalPathfinder:
+    # El área de bounds() se divide en clusters de HPA_CLUSTER_SIZE. En cada borde
+    # entre dos clusters, cada tramo continuo de celdas transitables a ambos lados
+    # aporta una entrada (su celda central). El grafo abstracto une entradas
+    # vecinas (coste 1) y las de un mismo cluster con su distancia BFS interna.
+    # Un cambio de celdas sólo reconstruye los clusters afectados. Los clusters se
+    # numeran desde un ancla fija, así que si bounds() se desplaza un múltiplo del
+    # tamaño de cluster (el mundo infinito se mueve por chunks) sólo se construyen
+    # los clusters que entran y se descartan los que salen.
+    def __init__(self, passable, bounds, cluster_size=None):
+        self.passable = passable
+        self.bounds_fn = bounds
+        self.cluster_size = cluster_size or Config.HPA_CLUSTER_SIZE
+        self.bounds = None
+        self.anchor = None
+        self.cluster_range = None    # (cx0, cy0, cx1, cy1), extremos exclusivos
+        self.dirty = set()
+        self.border_pairs = {}   # (cluster_a, cluster_b) -> [(nodo_a, nodo_b), ...]
+        self.inter = {}          # nodo -> {nodo del cluster vecino}
+        self.intra = {}          # nodo -> {nodo del mismo cluster: distancia}
+        self.intra_nodes = {}    # cluster -> nodos con aristas internas calculadas
+        self.stats = {"queries": 0, "expanded": 0, "full_builds": 0, "rebuilt_clusters": 0,
+                      "shifts": 0}
+
+    # --- invalidación ---
+    def invalidate(self, cells=None):
+        if cells is None:
+            self.bounds = None
+            return
+        if self.bounds is None:
+            return
+        for x, y in cells:
+            cluster = self._cluster_of(x, y)
+            if cluster is not None:
+                self.dirty.add(cluster)
+
+    def _ensure(self):
+        bounds = self.bounds_fn()
+        if bounds != self.bounds:
+            if self.bounds is None or not self._shift(bounds):
+                self._build_all(bounds)
+        elif self.dirty:
+            if len(self.dirty) >= Config.HPA_FULL_REBUILD_RATIO * len(self._clusters()):
+                self._build_all(bounds)
+            else:
+                self._rebuild_clusters(self.dirty)
+            self.dirty.clear()
+
+    # --- geometría de clusters ---
+    def _cluster_of(self, x, y):
+        x0, y0, x1, y1 = self.bounds
+        if not (x0 <= x < x1 and y0 <= y < y1):
+            return None
+        ax, ay = self.anchor
+        return (x - ax) // self.cluster_size, (y - ay) // self.cluster_size
+
+    def _cluster_rect(self, cluster, bounds=None):
+        x0, y0, x1, y1 = bounds or self.bounds
+        ax, ay = self.anchor
+        cx, cy = cluster
+        left = ax + cx * self.cluster_size
+        top = ay + cy * self.cluster_size
+        return (max(left, x0), max(top, y0),
+                min(left + self.cluster_size, x1), min(top + self.cluster_size, y1))
+
+    def _cluster_range_for(self, bounds):
+        x0, y0, x1, y1 = bounds
+        ax, ay = self.anchor
+        size = self.cluster_size
+        return ((x0 - ax) // size, (y0 - ay) // size,
+                (x1 - 1 - ax) // size + 1, (y1 - 1 - ay) // size + 1)
+
+    def _clusters(self, cluster_range=None):
+        cx0, cy0, cx1, cy1 = cluster_range or self.cluster_range
+        return [(cx, cy) for cy in range(cy0, cy1) for cx in range(cx0, cx1)]
+
+    def _neighbor_clusters(self, cluster):
+        cx, cy = cluster
+        cx0, cy0, cx1, cy1 = self.cluster_range
+        for other in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+            if cx0 <= other[0] < cx1 and cy0 <= other[1] < cy1:
+                yield other
+
+    def _border_key(self, a, b):
+        return (a, b) if a < b else (b, a)
+
+    def _nodes_of(self, cluster):
+        nodes = set()
+        for other in self._neighbor_clusters(cluster):
+            for na, nb in self.border_pairs.get(self._border_key(cluster, other), ()):
+                nodes.add(na if self._cluster_of(*na) == cluster else nb)
+        return nodes
+
+    # --- construcción ---
+    def _build_all(self, bounds):
+        self.bounds = bounds
+        self.anchor = bounds[:2]
+        self.cluster_range = self._cluster_range_for(bounds)
+        self.dirty.clear()
+        self.border_pairs = {}
+        self.inter = {}
+        self.intra = {}
+        self.intra_nodes = {}
+        clusters = self._clusters()
+        for cluster in clusters:
+            for other in self._neighbor_clusters(cluster):
+                if other > cluster:
+                    self._set_border(cluster, other, self._find_entrances(cluster, other))
+        for cluster in clusters:
+            self._build_intra(cluster)
+        self.stats["full_builds"] += 1
+
+    def _shift(self, bounds):
+        # Desplaza la rejilla de clusters; False si no encaja con el ancla actual
+        ax, ay = self.anchor
+        if (bounds[0] - ax) % self.cluster_size or (bounds[1] - ay) % self.cluster_size:
+            return False
+        old_bounds = self.bounds
+        old = set(self._clusters())
+        new = set(self._clusters(self._cluster_range_for(bounds)))
+        kept = old & new
+        if not kept:
+            return False
+        removed = old - new
+        for key in [key for key in self.border_pairs if key[0] in removed or key[1] in removed]:
+            self._set_border(key[0], key[1], [])
+            del self.border_pairs[key]
+        for cluster in removed:
+            for node in self.intra_nodes.pop(cluster, ()):
+                self.intra.pop(node, None)
+        self.bounds = bounds
+        self.cluster_range = self._cluster_range_for(bounds)
+        # los clusters recortados por el borde del área cambian de celdas
+        dirty = {c for c in self.dirty if c in new} | (new - old)
+        dirty.update(c for c in kept
+                     if self._cluster_rect(c, old_bounds) != self._cluster_rect(c))
+        # los que lindaban con un cluster descartado pierden nodos, no celdas
+        lost = {other for c in removed for other in self._neighbor_clusters(c) if other in kept}
+        self.dirty.clear()
+        self._rebuild_clusters(dirty, lost)
+        self.stats["shifts"] += 1
+        return True
+
+    def _rebuild_clusters(self, dirty, touched=()):
+        # Cada borde afectado se recalcula una vez y cada cluster se rehace una vez,
+        # aunque lo compartan varios clusters sucios. Los que sólo ganan o pierden
+        # entradas conservan las distancias entre los nodos que no cambian.
+        changed = set(dirty) | set(touched)
+        borders = {self._border_key(c, other) for c in dirty for other in self._neighbor_clusters(c)}
+        for key in borders:
+            pairs = self._find_entrances(*key)
+            if pairs != self.border_pairs.get(key, []):
+                self._set_border(key[0], key[1], pairs)
+                changed.update(key)
+        for c in changed:
+            self._build_intra(c, full=c in dirty)
+        self.stats["rebuilt_clusters"] += len(changed)
+
+    def _find_entrances(self, a, b):
+        # a está a la izquierda o encima de b
+        ax0, ay0, ax1, ay1 = self._cluster_rect(a)
+        if b[0] != a[0]:
+            cells = [((ax1 - 1, y), (ax1, y)) for y in range(ay0, ay1)]
+        else:
+            cells = [((x, ay1 - 1), (x, ay1)) for x in range(ax0, ax1)]
+        pairs, run = [], []
+        for pair in cells + [None]:
+            if pair is not None and self.passable(*pair[0]) and self.passable(*pair[1]):
+                run.append(pair)
+            elif run:
+                pairs.append(run[len(run) // 2])
+                run = []
+        return pairs
+
+    def _set_border(self, a, b, pairs):
+        key = self._border_key(a, b)
+        for na, nb in self.border_pairs.get(key, []):
+            for node, other in ((na, nb), (nb, na)):
+                links = self.inter.get(node)
+                if links is not None:
+                    links.discard(other)
+                    if not links:
+                        del self.inter[node]
+        self.border_pairs[key] = pairs
+        for na, nb in pairs:
+            self.inter.setdefault(na, set()).add(nb)
+            self.inter.setdefault(nb, set()).add(na)
+
+    def _build_intra(self, cluster, full=True):
+        # full=False: las celdas del cluster no cambiaron, sólo sus entradas
+        old = self.intra_nodes.pop(cluster, set())
+        nodes = self._nodes_of(cluster)
+        if full:
+            for node in old:
+                self.intra.pop(node, None)
+            fresh = nodes
+        else:
+            for node in old - nodes:
+                self.intra.pop(node, None)
+            for node in old & nodes:
+                links = self.intra[node]
+                for other in list(links):
+                    if other not in nodes:
+                        del links[other]
+            fresh = nodes - old
+        for node in fresh:
+            dist, _ = self._bfs_in_cluster(node, cluster)
+            self.intra[node] = {other: dist[other] for other in nodes
+                                if other != node and other in dist}
+            if not full:
+                for other, d in self.intra[node].items():
+                    if other not in fresh:
+                        self.intra[other][node] = d
+        self.intra_nodes[cluster] = nodes
+
+    def _bfs_in_cluster(self, start, cluster):
+        left, top, right, bottom = self._cluster_rect(cluster)
+        dist = {start: 0}
+        parent = {start: None}
+        q = deque([start])
+        while q:
+            x, y = q.popleft()
+            for dx, dy in [(1,0),(-1,0),(0,1),(0,-1)]:
+                nx, ny = x+dx, y+dy
+                if (left <= nx < right and top <= ny < bottom and
+                    (nx, ny) not in dist and self.passable(nx, ny)):
+                    dist[(nx, ny)] = dist[(x, y)] + 1
+                    parent[(nx, ny)] = (x, y)
+                    q.append((nx, ny))
+        self.stats["expanded"] += len(dist)
+        return dist, parent
+
+    # --- consultas ---
+    def next_step(self, start, goal):
+        self.stats["queries"] += 1
+        if start == goal:
+            return start
+        self._ensure()
+        start_cluster = self._cluster_of(*start)
+        goal_cluster = self._cluster_of(*goal)
+        if start_cluster is None or goal_cluster is None:
+            return start
+
+        start_dist, start_parent = self._bfs_in_cluster(start, start_cluster)
+        if goal in start_dist:
+            return self._first_step(start, goal, start_parent)
+        goal_dist, _ = self._bfs_in_cluster(goal, goal_cluster)
+        start_links = {n: start_dist[n] for n in self._nodes_of(start_cluster) if n in start_dist}
+        goal_links = {n: goal_dist[n] for n in self._nodes_of(goal_cluster) if n in goal_dist}
+
+        waypoint = self._abstract_search(start, goal, start_links, goal_links)
+        if waypoint is None:
+            return start
+        if abs(waypoint[0] - start[0]) + abs(waypoint[1] - start[1]) == 1:
+            return waypoint
+        if waypoint not in start_parent:
+            return start
+        return self._first_step(start, waypoint, start_parent)
+
+    def _abstract_search(self, start, goal, start_links, goal_links):
+        # A* sobre el grafo abstracto; devuelve el primer nodo tras `start`
+        h = lambda n: abs(n[0] - goal[0]) + abs(n[1] - goal[1])
+        g_cost = {}
+        first = {}
+        heap = []
+        counter = 0
+        for node, d in start_links.items():
+            g_cost[node] = d
+            first[node] = node
+            heapq.heappush(heap, (d + h(node), counter, node)); counter += 1
+        closed = set()
+        while heap:
+            _, _, node = heapq.heappop(heap)
+            if node in closed:
+                continue
+            if node == goal:
+                return first[node]
+            closed.add(node)
+            self.stats["expanded"] += 1
+            edges = [(n, 1) for n in self.inter.get(node, ())]
+            edges += list(self.intra.get(node, {}).items())
+            if node in goal_links:
+                edges.append((goal, goal_links[node]))
+            for nxt, cost in edges:
+                new_cost = g_cost[node] + cost
+                if new_cost < g_cost.get(nxt, float("inf")):
+                    g_cost[nxt] = new_cost
+                    # el nodo de arranque tiene distancia 0: su sucesor es el primer paso real
+                    first[nxt] = nxt if first[node] == start else first[node]
+                    heapq.heappush(heap, (new_cost + h(nxt), counter, nxt)); counter += 1
+        return None
+
+    def _first_step(self, start, target, parent):
+        cur = target
+        while parent[cur] != start:
+            cur = parent[cur]
+        return cur
+
+# ----- PLANIFICADOR INCREMENTAL (D* LITE) -----
+class IncrementalPlanner:
+    # D* Lite desde las salidas hacia el jugador: g/rhs son distancias a la salida
+    # más cercana. Entrar en una celda cuesta 1 si es transitable. Cuando cambian
+    # celdas sólo se reparan los vértices afectados; si el jugador se mueve, km
+    # corrige las claves en vez de reiniciar la búsqueda.
+    INF = float("inf")
+
+    def __init__(self, passable, goals, bounds):
+        self.passable = passable
+        self.goals_fn = goals
+        self.bounds_fn = bounds
+        self.needs_reset = True
+        self.pending = set()
+        self.stats = {"replans": 0, "expanded": 0, "full_resets": 0,
+                      "bfs_replans": 0, "bfs_expanded": 0}
+
+    def invalidate(self, cells=None):
+        if cells is None:
+            self.needs_reset = True
+        else:
+            self.pending.update(cells)
+
+    def _reset(self, start):
+        self.bounds = self.bounds_fn()
+        self.goals = set(self.goals_fn())
+        self.g = {}
+        self.rhs = {goal: 0 for goal in self.goals}
+        self.queue = []
+        self.queued = {}  # nodo -> clave vigente en la cola
+        self.counter = 0
+        self.km = 0
+        self.start = start
+        self.last = start
+        self.pending.clear()
+        self.needs_reset = False
+        for goal in self.goals:
+            self._push(goal)
+        self.stats["full_resets"] += 1
+
+    def _h(self, a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def _key(self, node):
+        best = min(self.g.get(node, self.INF), self.rhs.get(node, self.INF))
+        return (best + self._h(self.start, node) + self.km, best)
+
+    def _push(self, node):
+        key = self._key(node)
+        self.queued[node] = key
+        heapq.heappush(self.queue, (key, self.counter, node))
+        self.counter += 1
+
+    def _neighbors(self, node):
+        x0, y0, x1, y1 = self.bounds
+        x, y = node
+        for dx, dy in [(1,0),(-1,0),(0,1),(0,-1)]:
+            nx, ny = x+dx, y+dy
+            if x0 <= nx < x1 and y0 <= ny < y1:
+                yield nx, ny
+
+    def _update_vertex(self, node):
+        if node not in self.goals:
+            best = self.INF
+            # desde un muro no se sale, salvo que el jugador esté encima (un cambio
+            # del laberinto puede dejarlo ahí y puede moverse fuera)
+            if node == self.start or self.passable(*node):
+                for nxt in self._neighbors(node):
+                    if self.passable(*nxt):
+                        best = min(best, 1 + self.g.get(nxt, self.INF))
+            self.rhs[node] = best
+        self.queued.pop(node, None)
+        if self.g.get(node, self.INF) != self.rhs.get(node, self.INF):
+            self._push(node)
+
+    def _top_key(self):
+        while self.queue:
+            key, _, node = self.queue[0]
+            if self.queued.get(node) == key:
+                return key
+            heapq.heappop(self.queue)  # entrada obsoleta
+        return (self.INF, self.INF)
+
+    def _compute_shortest_path(self):
+        expanded = 0
+        while (self._top_key() < self._key(self.start) or
+               self.rhs.get(self.start, self.INF) != self.g.get(self.start, self.INF)):
+            if not self.queue:
+                break
+            key_old, _, node = heapq.heappop(self.queue)
+            del self.queued[node]
+            expanded += 1
+            key_new = self._key(node)
+            g, rhs = self.g.get(node, self.INF), self.rhs.get(node, self.INF)
+            if key_old < key_new:
+                self._push(node)
+            elif g > rhs:
+                self.g[node] = rhs
+                for prev in self._neighbors(node):
+                    self._update_vertex(prev)
+            else:
+                self.g[node] = self.INF
+                self._update_vertex(node)
+                for prev in self._neighbors(node):
+                    self._update_vertex(prev)
+        return expanded
+
+    def replan(self, start):
+        goals = set(self.goals_fn())
+        if not goals:
+            return []
+        if (self.needs_reset or goals != self.goals or
+            self.bounds != self.bounds_fn()):
+            self._reset(start)
+        changed = start != self.last or bool(self.pending) or self.stats["replans"] == 0
+        moved_from = None
+        if start != self.last:
+            self.km += self._h(self.last, start)
+            moved_from, self.last = self.last, start
+        self.start = start
+        if moved_from is not None:
+            # el origen cuenta como transitable aunque sea muro: revisar ambos
+            self._update_vertex(moved_from)
+            self._update_vertex(start)
+        for cell in self.pending:
+            self._update_vertex(cell)
+            for prev in self._neighbors(cell):
+                self._update_vertex(prev)
+        self.pending.clear()
+
+        expanded = self._compute_shortest_path()
+        self.stats["replans"] += 1
+        self.stats["expanded"] += expanded
+        if changed and Config.PLANNER_COMPARE_BFS:
+            self.stats["bfs_replans"] += 1
+            self.stats["bfs_expanded"] += self._bfs_cost(start)
+        return self.path(start)
+
+    def path(self, start):
+        if self.g.get(start, self.INF) == self.INF:
+            return []
+        path, cur = [], start
+        limit = (self.bounds[2] - self.bounds[0]) * (self.bounds[3] - self.bounds[1])
+        while cur not in self.goals and len(path) < limit:
+            best, best_cost = None, self.INF
+            for nxt in self._neighbors(cur):
+                cost = 1 + self.g.get(nxt, self.INF)
+                if cost < best_cost and self.passable(*nxt):
+                    best, best_cost = nxt, cost
+            if best is None:
+                return []
+            path.append(best)
+            cur = best
+        return path
+
+    def _bfs_cost(self, start):
+        # Celdas que expandiría un BFS completo desde cero hasta la salida más cercana
+        seen = {start}
+        q = deque([start])
+        while q:
+            node = q.popleft()
+            if node in self.goals:
+                break
+            for nxt in self._neighbors(node):
+                if nxt not in seen and self.passable(*nxt):
+                    seen.add(nxt)
+                    q.append(nxt)
+        return len(seen)
+
+    def summary(self):
+        s = self.stats
+        text = f"[Planner] replans={s['replans']} resets={s['full_resets']} expanded={s['expanded']}"
+        if s["bfs_replans"]:
+            saved = 1 - s["expanded"] / max(1, s["bfs_expanded"])
+            text += f" | full BFS would expand {s['bfs_expanded']} ({saved:.0%} saved)"
+        return text
+
+# ----- REBOBINADO -----
+class Snapshot:
+    def __init__(self, tick, time_ms, rows, flipped, glader_gates, exit_gates, state):
+        self.tick = tick
+        self.time_ms = time_ms
+        self.rows = rows                  # tupla de filas (tuplas) compartidas entre snapshots
+        self.flipped = flipped            # celdas cambiadas desde el snapshot anterior
+        self.glader_gates = glader_gates  # dicts de sólo lectura, compartidos si no cambiaron
+        self.exit_gates = exit_gates
+        self.state = state                # jugador, grievers, timers, flags
+        self.bytes = 0                    # memoria atribuida a este snapshot
+
+class RewindBuffer:
+    # Anillo de snapshots copy-on-write del laberinto. Sólo las filas tocadas
+    # desde el último snapshot se copian; el resto se comparte por referencia.
+    # La memoria de una fila se atribuye al snapshot más antiguo que la usa, así
+    # que al desalojarlo se traspasa al siguiente si éste la comparte.
+    def __init__(self, maze, capacity=None, budget_bytes=None):
+        self.maze = maze
+        self.capacity = capacity or Config.REWIND_MAX_SNAPSHOTS
+        self.budget_bytes = budget_bytes or Config.REWIND_MEMORY_BUDGET_BYTES
+        self.ring = [None] * self.capacity
+        self.first = 0
+        self.count = 0
+        self.next_tick = 0
+        self.total_bytes = 0
+        self.current_rows = [None] * maze.height
+        self.dirty_rows = set(range(maze.height))
+        self.flipped = []
+        self.dicts_dirty = True
+        self.row_bytes = sys.getsizeof(tuple(range(maze.width)))
+        self.stats = {"captured": 0, "evicted": 0, "rows_copied": 0, "rows_shared": 0}
+
+    def invalidate(self, cells=None):
+        self.dicts_dirty = True
+        if cells is None:
+            self.dirty_rows.update(range(self.maze.height))
+            return
+        for x, y in cells:
+            self.dirty_rows.add(y)
+            self.flipped.append((x, y))
+
+    def _at(self, index):
+        return self.ring[(self.first + index) % self.capacity]
+
+    def latest(self):
+        return self._at(self.count - 1) if self.count else None
+
+    def capture(self, time_ms, state):
+        prev = self.latest()
+        introduced = sys.getsizeof(self.current_rows) + 200
+        for y in self.dirty_rows:
+            self.current_rows[y] = tuple(self.maze.maze[y])
+        introduced += self.row_bytes * len(self.dirty_rows)
+        self.stats["rows_copied"] += len(self.dirty_rows)
+        self.stats["rows_shared"] += self.maze.height - len(self.dirty_rows)
+        self.dirty_rows.clear()
+
+        if self.dicts_dirty or prev is None:
+            gates, exits = dict(self.maze.glader_gates), dict(self.maze.exit_gates)
+            introduced += sys.getsizeof(gates) + sys.getsizeof(exits)
+        else:
+            gates, exits = prev.glader_gates, prev.exit_gates
+        self.dicts_dirty = False
+
+        snap = Snapshot(self.next_tick, time_ms, tuple(self.current_rows),
+                        tuple(self.flipped), gates, exits, state)
+        snap.bytes = introduced + sys.getsizeof(snap.flipped)
+        self.flipped = []
+        self.next_tick += 1
+
+        if self.count == self.capacity:
+            self._evict_oldest()
+        self.ring[(self.first + self.count) % self.capacity] = snap
+        self.count += 1
+        self.total_bytes += snap.bytes
+        self.stats["captured"] += 1
+        while self.total_bytes > self.budget_bytes and self.count > 1:
+            self._evict_oldest()
+        return snap
+
+    def _evict_oldest(self):
+        old = self._at(0)
+        self.ring[self.first] = None
+        self.first = (self.first + 1) % self.capacity
+        self.count -= 1
+        self.total_bytes -= old.bytes
+        self.stats["evicted"] += 1
+        if not self.count:
+            return
+        heir = self._at(0)
+        inherited = sum(self.row_bytes for a, b in zip(old.rows, heir.rows) if a is b)
+        if heir.glader_gates is old.glader_gates:
+            inherited += sys.getsizeof(old.glader_gates) + sys.getsizeof(old.exit_gates)
+        heir.bytes += inherited
+        self.total_bytes += inherited
+
+    def seek_tick(self, tick):
+        if not self.count:
+            return None
+        index = tick - self._at(0).tick
+        if not 0 <= index < self.count:
+            return None
+        return self._at(index)
+
+    def seek_time(self, time_ms):
+        # último snapshot con time_ms <= objetivo (búsqueda binaria)
+        lo, hi = 0, self.count - 1
+        if hi < 0:
+            return None
+        if self._at(0).time_ms > time_ms:
+            return self._at(0)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._at(mid).time_ms <= time_ms:
+                lo = mid
+            else:
+                hi = mid - 1
+        return self._at(lo)
+
+    def truncate_after(self, snap):
+        # descarta el "futuro" tras rebobinar y reanuda desde `snap`
+        while self.count and self.latest() is not snap:
+            last = self.latest()
+            self.ring[(self.first + self.count - 1) % self.capacity] = None
+            self.count -= 1
+            self.total_bytes -= last.bytes
+        self.current_rows = list(snap.rows)
+        self.dirty_rows.clear()
+        self.flipped = []
+        self.dicts_dirty = True
+        self.next_tick = snap.tick + 1
+
 # ----- JUEGO -----
 class MazeRunnerGame:
-    def __init__(self, difficulty="MEDIUM", seed: int | None = None):
+    def __init__(self, difficulty="MEDIUM", seed: int | None = None, endless: bool = False):
         if not pygame.get_init():
             pygame.init()
         if seed is not None:
             random.seed(seed)
 
         self.difficulty = difficulty
-        self.maze = MazeRunnerMaze(difficulty)
+        self.endless = endless
+        self.telemetry = Telemetry()
+        self.planner = IncrementalPlanner(self._is_valid_move, lambda: self.maze.exit_gates.keys(),
+                                          lambda: self.maze.bounds())
+        self.maze = self._create_maze(seed)
+        self._attach_maze()
         self.screen_width = self.maze.width * self.maze.cell_size
         self.screen_height = self.maze.height * self.maze.cell_size
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
-        pygame.display.set_caption(f"Maze Runner - {difficulty} Difficulty")
+        self._update_caption()
 
         self.clock = pygame.time.Clock()
         self.running = True
         self.victory = False
         self.defeat = False
 
-        self.player_sprite = PlayerSprite(self.maze.width // 2, self.maze.height // 2, self.maze.cell_size)
+        self.player_sprite = PlayerSprite(*self.maze._glade_center(), self.maze.cell_size)
         self.all_sprites = pygame.sprite.Group()
         self.all_sprites.add(self.maze.all_sprites)
         self.all_sprites.add(self.player_sprite)
@@ -498,6 +1812,11 @@ class MazeRunnerGame:
         self.timer_maze_changes_ms = 0
         self.move_cooldown_ms = 0
         self.day_time_ms = 0
+        self.input_queue = InputQueue()
+        self.input_latency = InputLatencyStats(mode=self.input_queue.mode)
+        self.show_hint = False
+        self.autopilot = False
+        self.hint_path = []
 
         self.griever_step_ms = d["griever_step_ms"]
         self.griever_timer_ms = 0
@@ -512,14 +1831,54 @@ class MazeRunnerGame:
             self.font = pygame.font.SysFont('Arial', 24)
             self.font_large = pygame.font.SysFont('Arial', 48)
 
+        self.telemetry.emit("session_start", difficulty=difficulty, seed=seed, endless=endless)
+
+    def _create_maze(self, seed=None):
+        if self.endless:
+            return EndlessMazeRunnerMaze(self.difficulty, seed, self.telemetry)
+        return MazeRunnerMaze(self.difficulty, self.telemetry)
+
+    def _attach_maze(self):
+        self.pathfinder = None
+        x0, y0, x1, y1 = self.maze.bounds()
+        if (x1 - x0) * (y1 - y0) >= Config.HPA_MIN_CELLS:
+            self.pathfinder = HierarchicalPathfinder(self._tile_is_passable_for_griever, self.maze.bounds)
+            self.maze.add_change_listener(self.pathfinder.invalidate)
+        self.planner.invalidate(None)
+        self.maze.add_change_listener(self.planner.invalidate)
+        self.hint_path = []
+        self.rewind = None
+        if self.maze.supports_rewind:
+            self.rewind = RewindBuffer(self.maze)
+            self.maze.add_change_listener(self.rewind.invalidate)
+
+    def _update_caption(self):
+        mode = " - Endless" if self.endless else ""
+        pygame.display.set_caption(f"Maze Runner - {self.difficulty} Difficulty{mode}")
+
+    def _refresh_sprites(self, added=None):
+        if added is not None:
+            # Ventana desplazada: los que salieron ya no están; los nuevos se dibujan
+            # antes que el jugador y los Grievers
+            self.all_sprites.remove(self.player_sprite, self.grievers)
+            self.all_sprites.add(added, self.player_sprite, self.grievers)
+            return
+        self.all_sprites.empty()
+        self.all_sprites.add(self.maze.all_sprites)
+        self.all_sprites.add(self.player_sprite)
+        self.all_sprites.add(self.grievers)  # re-draw grievers
+
     def _spawn_grievers(self):
         count = self.maze.difficulty["grievers"]
+        # ventana del tamaño del tablero centrada en el Glade (en modo infinito no empieza en 0)
+        cx, cy = self.maze._glade_center()
+        x0, y0 = cx - self.maze.width // 2 + 1, cy - self.maze.height // 2 + 1
         attempts = 0
         while len(self.grievers) < count and attempts < 500:
             attempts += 1
-            x = random.randint(1, self.maze.width-2)
-            y = random.randint(1, self.maze.height-2)
-            if not self.maze._is_outer_area(x, y):  # sólo área exterior
+            x = random.randint(x0, x0 + self.maze.width-3)
+            y = random.randint(y0, y0 + self.maze.height-3)
+            if not (self.maze._is_valid_coord(x, y) and self.maze._is_outer_area(x, y)):  # sólo área exterior
                 continue
             if self.maze.maze[y][x] != CELL_PATH:
                 continue
@@ -545,10 +1904,24 @@ class MazeRunnerGame:
         self.screen.fill(self.maze.colors['background'])
         for g in self.maze.gate_sprites:
             g.update(dt_ms)
-        self.all_sprites.draw(self.screen)
+        ox, oy = self.maze.camera_origin()
+        if ox == 0 and oy == 0:
+            self.all_sprites.draw(self.screen)
+        else:
+            dx, dy = -ox * self.maze.cell_size, -oy * self.maze.cell_size
+            for sprite in self.all_sprites:
+                self.screen.blit(sprite.image, sprite.rect.move(dx, dy))
+        self._draw_hint_path(ox, oy)
         self._draw_day_night_overlay()
         self._draw_ui()
 
+    def _draw_hint_path(self, ox, oy):
+        cs = self.maze.cell_size
+        for x, y in self.hint_path:
+            rect = pygame.Rect(0, 0, cs // 3, cs // 3)
+            rect.center = ((x - ox) * cs + cs // 2, (y - oy) * cs + cs // 2)
+            pygame.draw.rect(self.screen, (90, 200, 255), rect)
+
     def _draw_day_night_overlay(self):
         phase = (self.day_time_ms % Config.DAY_LENGTH_MS) / Config.DAY_LENGTH_MS
         if phase <= 0.5:
@@ -564,7 +1937,9 @@ class MazeRunnerGame:
         open_gates = sum(1 for sprite in self.maze.gate_sprites if sprite.is_open)
         glade_state = "IN THE GLADE" if self.maze.player_in_glade else "OUTSIDE - MAZE CHANGING!"
         info_text = f"Open gates: {open_gates}/{Config.GLADER_GATE_COUNT} | {glade_state}"
-        instructions = "Arrows/WASD: Move | R: Restart | 1-3: Difficulty | ESC: Quit | F: Seed"
+        instructions = "Arrows/WASD: Move | R: Restart | 1-3: Difficulty | E: Endless | ESC: Quit | F: Seed"
+        assist = (f"H: Path hint ({'ON' if self.show_hint else 'OFF'}) | P: Autopilot ({'ON' if self.autopilot else 'OFF'})"
+                  f" | B: Rewind {Config.REWIND_SECONDS}s")
 
         if self.victory:
             victory_text = "VICTORY! You escaped"
@@ -597,54 +1972,78 @@ class MazeRunnerGame:
             self.screen.blit(self.font.render(f"Exit relocate in: {exit_in:.1f}s", True, (220, 200, 150)), (10, 122))
             self.screen.blit(self.font.render(f"Next maze morph in: {maze_in:.1f}s (outside only)", True, (220, 160, 160)), (10, 144))
 
+            self.screen.blit(self.font.render(assist, True, (200, 200, 200)), (10, self.screen_height - 52))
             self.screen.blit(self.font.render(instructions, True, (200, 200, 200)), (10, self.screen_height - 30))
         except Exception as e:
             print(f"UI drawing error: {e}")
 
     # --- INPUT / MOVIMIENTO ---
+    def queue_direction(self, direction, pressed_at):
+        if self.victory or self.defeat:
+            return
+        if self.move_cooldown_ms > 0:
+            self.input_latency.record_buffered(self.move_delay_ms)
+        self.input_queue.push(direction, pressed_at)
+
     def handle_movement(self, keys, dt_ms: int):
         if self.victory or self.defeat:
+            self.input_queue.clear()
             return
         if self.move_cooldown_ms > 0:
             self.move_cooldown_ms -= dt_ms
             return
 
-        cx = self.player_sprite.grid_x
-        cy = self.player_sprite.grid_y
-        nx, ny = cx, cy
-        moved = False
-
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            ny -= 1; moved = True
-        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            ny += 1; moved = True
-        elif keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            nx -= 1; moved = True
-        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            nx += 1; moved = True
-
-        if moved and self._is_valid_move(nx, ny):
-            self.player_sprite.update_position(nx, ny)
-            self.move_cooldown_ms = self.move_delay_ms
-            self.play_sound("move")
-
-            self.maze.update_player_state(nx, ny)
-            if self.maze.check_exit(nx, ny):
-                self.victory = True
-                self.player_sprite.victory = True
-                self.play_sound("victory")
-
-    def _is_valid_move(self, x, y):
-        if not self.maze._is_valid_coord(x, y):
-            return False
-        cell = self.maze.maze[y][x]
-        blocked_cells = {CELL_WALL, CELL_OUTER_WALL, CELL_GLADER_WALL}
-        if cell in blocked_cells:
+        # Primero las pulsaciones en cola; si no hay, las teclas mantenidas
+        queued = self.input_queue.pop()
+        while queued is not None:
+            if self._try_move(*queued):
+                return
+            queued = self.input_queue.pop()
+        direction = self.input_queue.held_direction(keys)
+        if direction is not None:
+            self._try_move(direction, self.input_queue.claim(direction))
+        elif self.autopilot:
+            direction = self._autopilot_direction()
+            if direction is not None:
+                self._try_move(direction, None)
+
+    def _autopilot_direction(self):
+        start = (self.player_sprite.grid_x, self.player_sprite.grid_y)
+        path = self.planner.replan(start)
+        if not path:
+            return None
+        step = (path[0][0] - start[0], path[0][1] - start[1])
+        for direction, delta in DIRECTION_DELTAS.items():
+            if delta == step:
+                return direction
+        return None
+
+    def _try_move(self, direction, pressed_at):
+        dx, dy = DIRECTION_DELTAS[direction]
+        nx, ny = self.player_sprite.grid_x + dx, self.player_sprite.grid_y + dy
+        if not self._is_valid_move(nx, ny):
             return False
-        if cell == CELL_GLADER_GATE:
-            return self.maze.glader_gates.get((x, y), False)
+
+        self.player_sprite.update_position(nx, ny)
+        self.move_cooldown_ms = self.move_delay_ms
+        self.play_sound("move")
+        if pressed_at is not None:
+            self.input_latency.record_move(self.move_delay_ms, pressed_at, time.perf_counter())
+
+        self.maze.update_player_state(nx, ny)
+        if self.maze.set_focus(nx, ny):
+            self._refresh_sprites(self.maze.view_added)
+        if self.maze.check_exit(nx, ny):
+            self.victory = True
+            self.player_sprite.victory = True
+            self.telemetry.emit("victory", x=nx, y=ny)
+            self.play_sound("victory")
         return True
 
+    def _is_valid_move(self, x, y):
+        maze = self.maze
+        return maze.player_passable[(y - maze.pass_y0) * maze.pass_stride + x - maze.pass_x0]
+
     # --- TIEMPO / REGLAS ---
     def update_time(self, dt_ms: int):
         self.day_time_ms += dt_ms
@@ -665,10 +2064,7 @@ class MazeRunnerGame:
             self.timer_maze_changes_ms += dt_ms
             if self.timer_maze_changes_ms >= self.maze_change_time_ms and not (self.victory or self.defeat):
                 if self.maze.change_maze_layout():
-                    self.all_sprites.empty()
-                    self.all_sprites.add(self.maze.all_sprites)
-                    self.all_sprites.add(self.player_sprite)
-                    self.all_sprites.add(self.grievers)  # re-draw grievers
+                    self._refresh_sprites()
                     self.play_sound("maze_change")
                 self.timer_maze_changes_ms = 0
 
@@ -680,16 +2076,8 @@ class MazeRunnerGame:
 
     # --- GRIEVERS AI ---
     def _tile_is_passable_for_griever(self, x, y):
-        if not self.maze._is_valid_coord(x, y):
-            return False
-        cell = self.maze.maze[y][x]
-        if cell in (CELL_WALL, CELL_OUTER_WALL, CELL_GLADER_WALL):
-            return False
-        if cell == CELL_GLADER:  # no entran al Glade
-            return False
-        if cell == CELL_GLADER_GATE and not self.maze.glader_gates.get((x, y), False):
-            return False
-        return True  # PATH, open gates, EXIT ok
+        maze = self.maze
+        return maze.griever_passable[(y - maze.pass_y0) * maze.pass_stride + x - maze.pass_x0]
 
     def _next_step_bfs(self, start, goal):
         if start == goal:
@@ -711,9 +2099,16 @@ class MazeRunnerGame:
                     q.append((nx, ny))
         return start  # sin camino
 
+    def _chase_step(self, start, goal):
+        if self.pathfinder is not None:
+            return self.pathfinder.next_step(start, goal)
+        return self._next_step_bfs(start, goal)
+
     def _update_grievers(self):
         player_pos = (self.player_sprite.grid_x, self.player_sprite.grid_y)
         for g in self.grievers:
+            if not self.maze._is_valid_coord(g.grid_x, g.grid_y):
+                continue  # fuera de las tablas de paso (chunks no activos)
             if self.maze.player_in_glade:
                 # patrulla simple: intenta moverse al azar dentro del área exterior
                 dirs = [(1,0),(-1,0),(0,1),(0,-1)]
@@ -726,12 +2121,55 @@ class MazeRunnerGame:
                 if not moved:
                     pass
             else:
-                step = self._next_step_bfs((g.grid_x, g.grid_y), player_pos)
+                step = self._chase_step((g.grid_x, g.grid_y), player_pos)
                 g.update_position(step[0], step[1])
 
             # Colisión con jugador
-            if (g.grid_x, g.grid_y) == player_pos and not self.victory:
+            if (g.grid_x, g.grid_y) == player_pos and not (self.victory or self.defeat):
                 self.defeat = True
+                self.telemetry.emit("capture", x=player_pos[0], y=player_pos[1])
+
+    # --- REBOBINADO ---
+    def _capture_state(self):
+        return (
+            (self.player_sprite.grid_x, self.player_sprite.grid_y),
+            tuple((g.grid_x, g.grid_y) for g in self.grievers),
+            self.maze.player_in_glade, self.victory, self.defeat,
+            self.timer_glader_gates_ms, self.timer_exit_gates_ms, self.timer_maze_changes_ms,
+            self.griever_timer_ms, self.move_cooldown_ms,
+        )
+
+    def rewind_seconds(self, seconds):
+        if self.rewind is None:
+            return
+        snap = self.rewind.seek_time(self.day_time_ms - seconds * 1000)
+        if snap is not None:
+            self._restore_snapshot(snap)
+
+    def _restore_snapshot(self, snap):
+        maze = self.maze
+        maze.maze = [list(row) for row in snap.rows]
+        maze.glader_gates = dict(snap.glader_gates)
+        maze.exit_gates = dict(snap.exit_gates)
+        (player_pos, griever_positions, maze.player_in_glade, self.victory, self.defeat,
+         self.timer_glader_gates_ms, self.timer_exit_gates_ms, self.timer_maze_changes_ms,
+         self.griever_timer_ms, self.move_cooldown_ms) = snap.state
+        self.day_time_ms = snap.time_ms
+        maze.exit_found = False
+        maze._create_sprite_groups()
+        maze._cells_changed(None)
+        self.rewind.truncate_after(snap)
+
+        self.player_sprite.update_position(*player_pos)
+        self.player_sprite.victory = self.victory
+        self.player_sprite.rect.center = (self.player_sprite.target_x + maze.cell_size//2,
+                                          self.player_sprite.target_y + maze.cell_size//2)
+        self.grievers.empty()
+        for x, y in griever_positions:
+            self.grievers.add(GrieverSprite(x, y, maze.cell_size))
+        self.input_queue.clear()
+        self._refresh_sprites()
+        self.telemetry.emit("rewind", tick=snap.tick, time_ms=snap.time_ms)
 
     def change_difficulty(self, difficulty):
         self.difficulty = difficulty
@@ -741,8 +2179,11 @@ class MazeRunnerGame:
         try:
             if seed is not None:
                 random.seed(seed)
-            self.maze = MazeRunnerMaze(self.difficulty)
-            self.player_sprite = PlayerSprite(self.maze.width // 2, self.maze.height // 2, self.maze.cell_size)
+            self.maze = self._create_maze(seed)
+            self._attach_maze()
+            self._update_caption()
+            self.telemetry.emit("restart", difficulty=self.difficulty, seed=seed, endless=self.endless)
+            self.player_sprite = PlayerSprite(*self.maze._glade_center(), self.maze.cell_size)
             self.all_sprites = pygame.sprite.Group()
             self.all_sprites.add(self.maze.all_sprites)
             self.all_sprites.add(self.player_sprite)
@@ -760,6 +2201,7 @@ class MazeRunnerGame:
             self.timer_maze_changes_ms = 0
             self.move_cooldown_ms = 0
             self.day_time_ms = 0
+            self.input_queue.clear()
 
             self.grievers.empty()
             self._spawn_grievers()
@@ -778,23 +2220,50 @@ class MazeRunnerGame:
                 if event.type == pygame.QUIT:
                     self.running = False
                 elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
+                    if event.key in DIRECTION_KEYS:
+                        self.queue_direction(DIRECTION_KEYS[event.key], time.perf_counter())
+                    elif event.key == pygame.K_ESCAPE:
                         self.running = False
                     elif event.key == pygame.K_r and not self.victory:
                         self.restart_game(seed_to_apply)
                     elif event.key in [pygame.K_1, pygame.K_2, pygame.K_3] and not self.victory:
                         difficulties = {pygame.K_1: "EASY", pygame.K_2: "MEDIUM", pygame.K_3: "HARD"}
                         self.change_difficulty(difficulties[event.key])
+                    elif event.key == pygame.K_e and not self.victory:
+                        self.endless = not self.endless
+                        self.restart_game(seed_to_apply)
+                    elif event.key == pygame.K_h:
+                        self.show_hint = not self.show_hint
+                    elif event.key == pygame.K_p:
+                        self.autopilot = not self.autopilot
+                    elif event.key == pygame.K_b:
+                        self.rewind_seconds(Config.REWIND_SECONDS)
                     elif event.key == pygame.K_f:
                         seed_to_apply = int(time.time())
-                        print(f"[Seed] Using seed: {seed_to_apply}. Press R to restart with this seed.")
+                        self.telemetry.emit("seed", seed=seed_to_apply,
+                                            message=f"[Seed] Using seed: {seed_to_apply}. Press R to restart with this seed.")
 
             keys = pygame.key.get_pressed()
             self.handle_movement(keys, dt_ms)
             self.update_time(dt_ms)
+            if self.rewind is not None:
+                self.rewind.capture(self.day_time_ms, self._capture_state())
+            if self.show_hint and not (self.victory or self.defeat):
+                self.hint_path = self.planner.replan((self.player_sprite.grid_x, self.player_sprite.grid_y))
+            else:
+                self.hint_path = []
             self.player_sprite.update_animation()
             self.draw_game(dt_ms)
             pygame.display.flip()
+            self.input_latency.record_frame(time.perf_counter())
+        report = self.input_latency.report()
+        if report:
+            print(report)
+        self.telemetry.emit("session_end")
+        self.telemetry.close()
+        print(self.telemetry.summary())
+        if self.planner.stats["replans"]:
+            print(self.planner.summary())
         pygame.quit()
 
 # ----- ENTRYPOINT -----